@@ -0,0 +1,70 @@
+"""
+Build the C/AVX2 batched kernel (src/_lif_core.c) as a cffi extension
+module in src/.
+
+    python build_lif_core.py
+
+simulate_lif_exact_batch uses the extension when it is present and falls
+back to the Numba kernel otherwise, so building is optional. Requires cffi
+and a C compiler. On x86-64 the kernel is compiled for AVX2/FMA (so the CPU
+must support them); elsewhere the portable scalar path is built. OpenMP is
+used when the compiler supports it (thread count follows OMP_NUM_THREADS),
+otherwise the build is retried single-threaded.
+"""
+import glob
+import os
+import platform
+import shutil
+import sys
+
+from cffi import FFI, VerificationError
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SRC = os.path.join(ROOT, "src")
+
+# Signature of the exported function in src/_lif_core.c
+CDEF = """
+void sim_exact_batch_f32(const float *I, float *v, float *v_hist, uint8_t *S,
+                         int64_t T, int64_t N,
+                         float a, float bias, float gain, float v_th, float v_reset);
+"""
+
+X86_64 = platform.machine().lower() in ("x86_64", "amd64")
+
+
+def make_ffibuilder(openmp=True):
+    """FFI builder for the extension, with or without OpenMP."""
+    msvc = sys.platform == "win32"
+    compile_args = ["/O2" if msvc else "-O3"]
+    link_args = []
+    if X86_64:
+        compile_args += ["/arch:AVX2"] if msvc else ["-mavx2", "-mfma"]
+    if openmp:
+        compile_args.append("/openmp" if msvc else "-fopenmp")
+        if not msvc:
+            link_args.append("-fopenmp")
+
+    ffibuilder = FFI()
+    ffibuilder.cdef(CDEF)
+    ffibuilder.set_source(
+        "_lif_core_ffi",
+        "#include <stdint.h>\n" + CDEF,
+        sources=[os.path.join(SRC, "_lif_core.c")],
+        extra_compile_args=compile_args,
+        extra_link_args=link_args,
+    )
+    return ffibuilder
+
+
+if __name__ == "__main__":
+    build_dir = os.path.join(ROOT, "build")
+    try:
+        make_ffibuilder(openmp=True).compile(tmpdir=build_dir)
+    except VerificationError:
+        # e.g. Apple clang, which does not accept -fopenmp
+        print("OpenMP build failed; building without OpenMP", file=sys.stderr)
+        make_ffibuilder(openmp=False).compile(tmpdir=build_dir)
+    for pattern in ("_lif_core_ffi*.so", "_lif_core_ffi*.pyd"):
+        for path in glob.glob(os.path.join(build_dir, pattern)):
+            shutil.copy(path, SRC)
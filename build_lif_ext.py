@@ -0,0 +1,53 @@
+"""
+Compile the serial simulation kernels ahead of time into src/lif_ext.
+
+    python build_lif_ext.py
+
+simulate_lif_exact, simulate_lif_exact_const, simulate_lif_all and
+sweep_lif_all pick up the compiled extension when it is present and fall
+back to the JIT-compiled kernels otherwise, so building is optional; it
+only removes the one-off JIT compilation when the kernel cache is cold
+(fresh checkouts, read-only installs, short-lived scripts). With it,
+compare_dt_errors and plot_traces_for_dt compile nothing at run time.
+
+numba.pycc is pending deprecation in Numba (importing it warns); should it
+go away, simply skip this step.
+"""
+import os
+
+from numba.pycc import CC
+
+from src.lif_numba import (
+    _count_all_three,
+    _first_forward_failure,
+    _sim_all_three,
+    _sim_exact_const,
+    _sim_exact_into,
+)
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+cc = CC("lif_ext")
+cc.output_dir = os.path.join(ROOT, "src")
+
+# Same sources as the JIT kernels. PARAMS is (dt, tau_m, v_rest, v_reset,
+# v_th, R), and the bounds (v_min, v_max) follow it where they apply.
+PARAMS = "f8, f8, f8, f8, f8, f8"
+cc.export("sim_exact", f"i8(f4[:], {PARAMS}, f4[:], i8[:])")(_sim_exact_into.py_func)
+cc.export(
+    "sim_exact_const", f"Tuple((f4[::1], i8[::1]))(f8, i8, {PARAMS})"
+)(_sim_exact_const.py_func)
+cc.export(
+    "sim_all_three", f"Tuple((f4[:, ::1], i8[:, ::1], i8[::1]))(f4[::1], {PARAMS})"
+)(_sim_all_three.py_func)
+cc.export(
+    "count_all_three", f"Tuple((i8[::1], i8[::1], b1))(f8, i8, {PARAMS}, f8, f8)"
+)(_count_all_three.py_func)
+cc.export(
+    "first_forward_failure", f"Tuple((i8, f8))(f8, i8, {PARAMS}, f8, f8)"
+)(_first_forward_failure.py_func)
+
+
+if __name__ == "__main__":
+    cc.compile()
@@ -1,9 +1,7 @@
+import functools
 import os
 import sys
 import numpy as np
-import matplotlib
-matplotlib.use("TkAgg")  # or "Qt5Agg" if Qt is installed
-import matplotlib.pyplot as plt
 
 
 # Allow importing from src/ when running this script directly
@@ -11,57 +9,83 @@ ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if ROOT not in sys.path:
     sys.path.append(ROOT)
 
-from src.lif_forward import simulate_lif_forward
-from src.lif_backward import simulate_lif_backward
-from src.lif_exact import simulate_lif_exact
+from src.lif_exact import simulate_lif_exact_const
+from src.lif_fused import INTEGRATORS, simulate_lif_all, sweep_lif_all
+
+
+@functools.lru_cache(maxsize=None)
+def _pyplot():
+    """
+    Import pyplot on first use, so that importing this module for its
+    simulation helpers does not initialise a GUI backend.
+
+    An MPLBACKEND set in the environment is respected; otherwise TkAgg is
+    used, or Agg when there is no display to draw on.
+    """
+    import matplotlib
+
+    if os.environ.get("MPLBACKEND") is None:
+        headless = sys.platform.startswith("linux") and not (
+            os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY")
+        )
+        matplotlib.use("Agg" if headless else "TkAgg")  # or "Qt5Agg" if Qt is installed
+
+    import matplotlib.pyplot as plt
+    return plt
 
 
 def constant_current(T, dt, I_value):
+    """
+    Constant input of int(T / dt) steps, as a read-only zero-copy view of a
+    single float32 value.
+    """
     steps = int(T / dt)
-    return np.full(steps, I_value, dtype=float)
+    return np.broadcast_to(np.float32(I_value), (steps,))
 
 
 def compute_spike_times(t, s_hist):
     """Return an array of spike times where s_hist is 1."""
-    return t[s_hist > 0.5]
+    return t[np.flatnonzero(s_hist)]
+
+
+@functools.lru_cache(maxsize=32)
+def _reference_spike_times(steps, dt_ref, I_value):
+    """
+    Spike times of the high-resolution exact reference run.
+
+    This is the longest simulation of a dt sweep and depends only on its
+    arguments, so it is memoised across compare_dt_errors calls. The cached
+    array is shared and therefore read-only.
+    """
+    spike_times, _ = simulate_lif_exact_const(I_value, steps, dt_ref, return_spike_times=True)
+    spike_times.setflags(write=False)
+    return spike_times
 
 
 def compare_dt_errors(dt_values, T=1.0, I_value=1.5):
     """
     For each dt and integrator, compute simple error metrics against
     a reference 'exact' simulation with very small dt_ref.
+
+    Returns a dict mapping each integrator name to an array of shape
+    (len(dt_values), 3) with columns (dt, spike count error, first spike
+    time error).
     """
     dt_ref = min(dt_values) / 10.0
-    I_ref = constant_current(T, dt_ref, I_value)
-    t_ref, v_ref, s_ref = simulate_lif_exact(I_ref, dt_ref)
-    spike_times_ref = compute_spike_times(t_ref, s_ref)
+    spike_times_ref = _reference_spike_times(int(T / dt_ref), dt_ref, I_value)
+    first_spike_ref = spike_times_ref[0] if len(spike_times_ref) > 0 else np.nan
 
-    errors = {
-        "forward": [],
-        "backward": [],
-        "exact": [],
-    }
+    errors = {name: np.empty((len(dt_values), 3)) for name in INTEGRATORS}
 
-    for dt in dt_values:
-        I_t = constant_current(T, dt, I_value)
+    # All dt values are simulated in parallel; only spike statistics come back
+    n_spikes, first_spike = sweep_lif_all(dt_values, T, I_value)
 
-        for name, sim_fn in [
-            ("forward", simulate_lif_forward),
-            ("backward", simulate_lif_backward),
-            ("exact", simulate_lif_exact),
-        ]:
-            t, v, s = sim_fn(I_t, dt)
-            spike_times = compute_spike_times(t, s)
-
-            # Simple metrics: spike count error, first spike time error (if exists)
-            spike_count_err = len(spike_times) - len(spike_times_ref)
-
-            if len(spike_times) > 0 and len(spike_times_ref) > 0:
-                first_spike_err = spike_times[0] - spike_times_ref[0]
-            else:
-                first_spike_err = np.nan
-
-            errors[name].append((dt, spike_count_err, first_spike_err))
+    for j, name in enumerate(INTEGRATORS):
+        # Simple metrics: spike count error, first spike time error (NaN if
+        # either run has no spike, since first_spike is NaN there)
+        errors[name][:, 0] = dt_values
+        errors[name][:, 1] = n_spikes[:, j] - len(spike_times_ref)
+        errors[name][:, 2] = first_spike[:, j] - first_spike_ref
 
     return errors
 
@@ -70,20 +94,16 @@ def plot_traces_for_dt(dt, T=0.5, I_value=1.5):
     """
     Plot v(t) and spikes for all three integrators at a given dt.
     """
+    plt = _pyplot()
     I_t = constant_current(T, dt, I_value)
+    t = np.arange(len(I_t)) * dt
 
-    results = {}
-    for name, sim_fn in [
-        ("forward", simulate_lif_forward),
-        ("backward", simulate_lif_backward),
-        ("exact", simulate_lif_exact),
-    ]:
-        t, v, s = sim_fn(I_t, dt)
-        results[name] = (t, v, s)
+    # All three integrators in one pass over the input
+    results = simulate_lif_all(I_t, dt)
 
     # Plot membrane potentials
     plt.figure(figsize=(8, 4))
-    for name, (t, v, s) in results.items():
+    for name, (spike_times, v) in results.items():
         plt.plot(t * 1000.0, v, label=name)  # time in ms
     plt.xlabel("Time (ms)")
     plt.ylabel("Membrane potential v(t)")
@@ -94,9 +114,8 @@ def plot_traces_for_dt(dt, T=0.5, I_value=1.5):
 
     # Plot spike rasters
     plt.figure(figsize=(8, 2.5))
-    for idx, (name, (t, v, s)) in enumerate(results.items()):
-        spike_times = t[s > 0.5] * 1000.0
-        plt.vlines(spike_times, idx + 0.1, idx + 0.9, label=name)
+    for idx, (name, (spike_times, v)) in enumerate(results.items()):
+        plt.vlines(spike_times * 1000.0, idx + 0.1, idx + 0.9, label=name)
     plt.yticks([1, 2, 3], ["forward", "backward", "exact"])
     plt.xlabel("Time (ms)")
     plt.title(f"LIF spike trains for dt = {dt*1000:.2f} ms")
@@ -109,12 +128,12 @@ def plot_error_vs_dt(errors):
     Given errors dict from compare_dt_errors, plot spike count and
     first spike time errors vs dt for each integrator.
     """
+    plt = _pyplot()
+
     # Spike count error
     plt.figure(figsize=(8, 4))
     for name, vals in errors.items():
-        dts = [v[0] * 1000.0 for v in vals]  # ms
-        spike_count_errs = [v[1] for v in vals]
-        plt.plot(dts, spike_count_errs, marker="o", label=name)
+        plt.plot(vals[:, 0] * 1000.0, vals[:, 1], marker="o", label=name)  # dt in ms
     plt.xlabel("dt (ms)")
     plt.ylabel("Spike count error (vs reference)")
     plt.title("Spike count error vs dt")
@@ -125,11 +144,7 @@ def plot_error_vs_dt(errors):
     # First spike timing error
     plt.figure(figsize=(8, 4))
     for name, vals in errors.items():
-        dts = [v[0] * 1000.0 for v in vals]
-        first_spike_errs = [
-            v[2] * 1000.0 if not np.isnan(v[2]) else np.nan for v in vals
-        ]  # ms
-        plt.plot(dts, first_spike_errs, marker="o", label=name)
+        plt.plot(vals[:, 0] * 1000.0, vals[:, 2] * 1000.0, marker="o", label=name)  # ms
     plt.xlabel("dt (ms)")
     plt.ylabel("First spike time error (ms)")
     plt.title("First spike timing error vs dt")
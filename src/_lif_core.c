@@ -0,0 +1,82 @@
+/*
+ * Batched exact LIF integration in C, bound to Python through cffi
+ * (see build_lif_core.py and simulate_lif_exact_batch).
+ *
+ * Same recurrence and output layout as _sim_exact_batch in lif_numba.py:
+ * I and v_hist are (T, N) row-major float32, S is (T, ceil(N / 8)) with bit
+ * j % 8 of byte j / 8 set when neuron j spikes. v holds the N neuron states
+ * and is updated in place.
+ */
+#include <stdint.h>
+
+#ifdef __AVX2__
+#include <immintrin.h>
+#endif
+
+/* Neurons per OpenMP work item; a multiple of 8 so each owns whole bytes of S. */
+#define LIF_BLOCK 64
+
+static void sim_block(const float *I, float *v, float *v_hist, uint8_t *S,
+                      int64_t T, int64_t N, int64_t j0, int64_t j1,
+                      float a, float bias, float gain, float v_th, float v_reset)
+{
+    const int64_t n_bytes = (N + 7) / 8;
+    int64_t j_vec = j0;
+
+#ifdef __AVX2__
+    const __m256 av = _mm256_set1_ps(a);
+    const __m256 biasv = _mm256_set1_ps(bias);
+    const __m256 gainv = _mm256_set1_ps(gain);
+    const __m256 thv = _mm256_set1_ps(v_th);
+    const __m256 resetv = _mm256_set1_ps(v_reset);
+    j_vec = j0 + ((j1 - j0) / 8) * 8;
+#endif
+
+    /* Time outermost so each step touches whole rows of the block; the
+     * block's state stays in L1 between steps. */
+    for (int64_t n = 0; n < T; ++n) {
+        const float *I_n = I + n * N;
+        float *v_hist_n = v_hist + n * N;
+        uint8_t *S_n = S + n * n_bytes;
+
+#ifdef __AVX2__
+        for (int64_t j = j0; j < j_vec; j += 8) {
+            /* v = a*v + (bias + gain*I) */
+            __m256 iv = _mm256_loadu_ps(I_n + j);
+            __m256 vv = _mm256_fmadd_ps(av, _mm256_loadu_ps(v + j),
+                                        _mm256_fmadd_ps(gainv, iv, biasv));
+            __m256 mask = _mm256_cmp_ps(vv, thv, _CMP_GE_OQ);
+            /* Branchless reset: select v_reset where the compare set the mask */
+            vv = _mm256_blendv_ps(vv, resetv, mask);
+            _mm256_storeu_ps(v + j, vv);
+            _mm256_storeu_ps(v_hist_n + j, vv);
+            S_n[j / 8] = (uint8_t)_mm256_movemask_ps(mask);
+        }
+#endif
+
+        /* Scalar remainder (or the whole block, without AVX2) */
+        for (int64_t j = j_vec; j < j1; ++j) {
+            float x = a * v[j] + (bias + gain * I_n[j]);
+            if (x >= v_th) {
+                x = v_reset;
+                S_n[j / 8] |= (uint8_t)(1u << (j % 8));
+            }
+            v[j] = x;
+            v_hist_n[j] = x;
+        }
+    }
+}
+
+void sim_exact_batch_f32(const float *I, float *v, float *v_hist, uint8_t *S,
+                         int64_t T, int64_t N,
+                         float a, float bias, float gain, float v_th, float v_reset)
+{
+    const int64_t n_blocks = (N + LIF_BLOCK - 1) / LIF_BLOCK;
+
+    #pragma omp parallel for schedule(static)
+    for (int64_t blk = 0; blk < n_blocks; ++blk) {
+        int64_t j0 = blk * LIF_BLOCK;
+        int64_t j1 = j0 + LIF_BLOCK < N ? j0 + LIF_BLOCK : N;
+        sim_block(I, v, v_hist, S, T, N, j0, j1, a, bias, gain, v_th, v_reset);
+    }
+}
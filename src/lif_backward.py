@@ -1,35 +1,43 @@
 import numpy as np
 
+from .lif_numba import _sim_backward
+
 
 def lif_step_backward(v, I_t, dt, tau_m, v_rest, v_reset, v_th, R=1.0):
     """
     Backward (implicit) Euler step for current-based LIF neuron.
 
     Assumes input current I_t is constant over the interval [t, t+dt].
+    Operates on a single scalar voltage.
     """
     # Closed-form backward Euler update for linear LIF dynamics:
     # v_{n+1} = (v_n + (dt/tau_m)*(v_rest + R*I_t)) / (1 + dt/tau_m)
     alpha = dt / tau_m
     v_next = (v + alpha * (v_rest + R * I_t)) / (1.0 + alpha)
 
-    spike = (v_next >= v_th).astype(float)
-    v_next = np.where(spike > 0, v_reset, v_next)
+    spike = 1.0 if v_next >= v_th else 0.0
+    if spike:
+        v_next = v_reset
     return v_next, spike
 
 
-def simulate_lif_backward(I_t, dt, tau_m=20e-3, v_rest=0.0, v_reset=0.0, v_th=1.0, R=1.0):
+def simulate_lif_backward(I_t, dt, tau_m=20e-3, v_rest=0.0, v_reset=0.0, v_th=1.0, R=1.0,
+                          return_spike_times=False):
     """
     Simulate a single LIF neuron using backward (implicit) Euler integration.
+
+    Returns (t, v_hist, s_hist), or (spike_times, v_hist) if return_spike_times.
     """
+    I_t = np.ascontiguousarray(I_t, dtype=np.float32)
     T = len(I_t)
-    t = np.arange(T) * dt
-    v_hist = np.zeros(T)
-    s_hist = np.zeros(T)
-    v = v_rest
+    v_hist, spike_idx = _sim_backward(
+        I_t, float(dt), float(tau_m), float(v_rest), float(v_reset), float(v_th), float(R)
+    )
 
-    for n in range(T):
-        v, s = lif_step_backward(v, I_t[n], dt, tau_m, v_rest, v_reset, v_th, R)
-        v_hist[n] = v
-        s_hist[n] = s
+    if return_spike_times:
+        return spike_idx * dt, v_hist
 
+    t = np.arange(T) * dt
+    s_hist = np.zeros(T, dtype=np.uint8)
+    s_hist[spike_idx] = 1
     return t, v_hist, s_hist
@@ -1,13 +1,40 @@
+import math
+
 import numpy as np
 
+from .lif_numba import _sim_exact, _sim_exact_batch, _sim_exact_const
+
+try:
+    # Ahead-of-time builds (see build_lif_ext.py). sim_exact_const takes the
+    # same arguments as the JIT kernel, so it simply replaces it.
+    from .lif_ext import sim_exact as _sim_exact_aot, sim_exact_const as _sim_exact_const
+except ImportError:
+    _sim_exact_aot = None
+
+try:
+    # C/AVX2 build of the batched kernel (see build_lif_core.py)
+    from ._lif_core_ffi import ffi as _core_ffi, lib as _core_lib
+except ImportError:
+    _core_lib = None
+
+
+# Inputs whose constant runs are at least this long on average are solved
+# segment-by-segment in closed form; shorter runs go through the compiled loop.
+# Each run costs the segment solver ~0.1 ms of NumPy calls against ~2-3 ns
+# per step for the loop, so runs have to be tens of thousands of steps long.
+_MIN_MEAN_RUN = 65536
+
 
 def lif_step_exact(v, I_t, dt, tau_m, v_rest, v_reset, v_th, R=1.0):
     """
     Exact (exponential) integration step for current-based LIF neuron
     with piecewise constant input over [t, t+dt].
+
+    Operates on a single scalar voltage; see simulate_lif_exact_batch for
+    populations.
     """
     # Exponential decay factor
-    a = np.exp(-dt / tau_m)
+    a = math.exp(-dt / tau_m)
 
     # Steady-state voltage under constant input I_t
     v_inf = v_rest + R * I_t
@@ -15,24 +42,249 @@ def lif_step_exact(v, I_t, dt, tau_m, v_rest, v_reset, v_th, R=1.0):
     # Exact solution at t + dt
     v_next = v_inf + (v - v_inf) * a
 
-    spike = (v_next >= v_th).astype(float)
-    v_next = np.where(spike > 0, v_reset, v_next)
+    spike = 1.0 if v_next >= v_th else 0.0
+    if spike:
+        v_next = v_reset
     return v_next, spike
 
 
-def simulate_lif_exact(I_t, dt, tau_m=20e-3, v_rest=0.0, v_reset=0.0, v_th=1.0, R=1.0):
+def _first_crossing(v0, v_inf, a, v_th, limit):
+    """
+    Voltages v_inf + (v0 - v_inf)*a**k for k = 1, 2, ... under constant input,
+    up to and including the first step that reaches v_th.
+
+    Returns (k, v_seg) where k is the spiking step (1-based) or None if the
+    threshold is not reached within `limit` steps, in which case v_seg holds
+    all `limit` voltages.
+    """
+    d = v0 - v_inf
+    if v_inf <= v_th and v_inf + d * a < v_th:
+        # Relaxing towards a v_inf at or below threshold: never crosses. Decide
+        # this analytically, since once a**k underflows the voltages round
+        # onto v_inf, which at rheobase (v_inf == v_th) would read as a spike.
+        return None, v_inf + d * a ** np.arange(1, limit + 1)
+
+    if v_inf + d * a >= v_th:
+        m = 1
+    else:
+        # Rising towards v_inf > v_th: first k with d*a**k <= v_th - v_inf.
+        # One extra step absorbs rounding in the logarithms.
+        m = int(np.ceil(np.log((v_th - v_inf) / d) / np.log(a))) + 1
+    m = max(1, min(m, limit))
+
+    while True:
+        v_seg = v_inf + d * a ** np.arange(1, m + 1)
+        hits = np.flatnonzero(v_seg >= v_th)
+        if hits.size:
+            k = hits[0] + 1
+            return k, v_seg[:k]
+        if m == limit:
+            return None, v_seg
+        m = limit
+
+
+def _closed_form_runs(I_t, v_rest, v_th, R):
+    """
+    Start indices of the constant runs of I_t if _simulate_exact_segments
+    should handle it, or None if the compiled loop is faster.
+
+    That needs long runs, and the neuron must fire in every run: a silent
+    run costs a power evaluation per step, far more than the loop.
+    """
+    if len(I_t) < _MIN_MEAN_RUN:
+        return None
+    I_low = I_t.min() if R >= 0 else I_t.max()
+    if not v_rest + R * float(I_low) > v_th:
+        return None
+    starts = np.flatnonzero(I_t[1:] != I_t[:-1]) + 1
+    if len(I_t) < _MIN_MEAN_RUN * (len(starts) + 1):
+        return None
+    return np.concatenate(([0], starts))
+
+
+def _simulate_exact_segments(I_t, starts, dt, tau_m, v_rest, v_reset, v_th, R):
+    """
+    Exact integration for piecewise-constant input without a per-step loop.
+    starts holds the first index of each constant run of I_t.
+
+    Within a run of constant input the first threshold crossing is found in
+    closed form. Every later inter-spike interval in the same run starts from
+    v_reset, so it is computed once and tiled, making the cost per run
+    independent of the number of spikes it contains.
+    """
+    T = len(I_t)
+    v_hist = np.zeros(T, dtype=np.float32)
+    spikes = [np.zeros(0, dtype=np.int64)]
+    a = np.exp(-dt / tau_m)
+
+    stops = np.append(starts[1:], T)
+    v = v_rest
+
+    for start, stop in zip(starts, stops):
+        v_inf = v_rest + R * float(I_t[start])
+
+        # Carry the voltage from the previous run up to the first spike
+        k, v_seg = _first_crossing(v, v_inf, a, v_th, stop - start)
+        v_hist[start:start + len(v_seg)] = v_seg
+        if k is None:
+            v = v_seg[-1]
+            continue
+        n = start + k
+        v_hist[n - 1] = v_reset
+        spikes.append(np.array([n - 1]))
+        v = v_reset
+        if n == stop:
+            continue
+
+        # From here on the trajectory repeats with a fixed period
+        k, v_seg = _first_crossing(v_reset, v_inf, a, v_th, stop - n)
+        if k is None:
+            v_hist[n:stop] = v_seg
+            v = v_seg[-1]
+            continue
+        v_seg[-1] = v_reset
+        reps = (stop - n) // k
+        # Tile the period in place by doubling, without a float64 temporary
+        v_hist[n:n + k] = v_seg
+        done = k
+        while done < reps * k:
+            size = min(done, reps * k - done)
+            v_hist[n + done:n + done + size] = v_hist[n:n + size]
+            done += size
+        spikes.append(np.arange(n + k - 1, n + reps * k, k))
+        n += reps * k
+
+        tail = stop - n
+        v_hist[n:stop] = v_seg[:tail]
+        v = v_seg[tail - 1] if tail else v_reset
+
+    return v_hist, np.concatenate(spikes)
+
+
+def simulate_lif_exact(I_t, dt, tau_m=20e-3, v_rest=0.0, v_reset=0.0, v_th=1.0, R=1.0,
+                       return_spike_times=False):
     """
     Simulate a single LIF neuron using exact (exponential) integration.
+
+    Returns (t, v_hist, s_hist), or (spike_times, v_hist) if return_spike_times.
     """
+    I_t = np.asarray(I_t, dtype=np.float32)
     T = len(I_t)
+    params = (float(dt), float(tau_m), float(v_rest), float(v_reset), float(v_th), float(R))
+
+    # Run starts for the closed-form solver, or None to use a compiled loop
+    starts = None if I_t.strides[0] == 0 else _closed_form_runs(I_t, v_rest, v_th, R)
+
+    if T > 0 and I_t.strides[0] == 0:
+        # A broadcast scalar (e.g. from np.broadcast_to): constant input
+        v_hist, spike_idx = _sim_exact_const(float(I_t[0]), T, *params)
+    elif starts is not None:
+        v_hist, spike_idx = _simulate_exact_segments(I_t, starts, *params)
+    elif _sim_exact_aot is not None:
+        v_hist = np.zeros(T, dtype=np.float32)
+        spike_idx = np.empty(T, dtype=np.int64)
+        k = _sim_exact_aot(I_t, *params, v_hist, spike_idx)
+        spike_idx = spike_idx[:k].copy()
+    else:
+        v_hist, spike_idx = _sim_exact(I_t, *params)
+
+    if return_spike_times:
+        return spike_idx * dt, v_hist
+
     t = np.arange(T) * dt
-    v_hist = np.zeros(T)
-    s_hist = np.zeros(T)
-    v = v_rest
+    s_hist = np.zeros(T, dtype=np.uint8)
+    s_hist[spike_idx] = 1
+    return t, v_hist, s_hist
+
+
+def simulate_lif_exact_const(I_value, steps, dt, tau_m=20e-3, v_rest=0.0, v_reset=0.0, v_th=1.0, R=1.0,
+                             return_spike_times=False):
+    """
+    Simulate a single LIF neuron under a constant input current I_value for
+    `steps` time steps using exact (exponential) integration.
+
+    Same result as simulate_lif_exact(np.full(steps, I_value), dt, ...), but
+    no input array is built or read.
+
+    Returns (t, v_hist, s_hist), or (spike_times, v_hist) if return_spike_times.
+    """
+    steps = int(steps)
+    # I_value is rounded to float32 like the input arrays of simulate_lif_exact
+    v_hist, spike_idx = _sim_exact_const(
+        float(np.float32(I_value)), steps, float(dt), float(tau_m), float(v_rest),
+        float(v_reset), float(v_th), float(R),
+    )
+
+    if return_spike_times:
+        return spike_idx * dt, v_hist
+
+    t = np.arange(steps) * dt
+    s_hist = np.zeros(steps, dtype=np.uint8)
+    s_hist[spike_idx] = 1
+    return t, v_hist, s_hist
+
+
+def _sim_exact_batch_c(I_t, dt, tau_m, v_rest, v_reset, v_th, R):
+    """
+    Call the C batched kernel; same arguments and results as _sim_exact_batch.
+    """
+    I_t = np.ascontiguousarray(I_t)
+    T, N = I_t.shape
+    v = np.full(N, v_rest, dtype=np.float32)
+    v_hist = np.empty((T, N), dtype=np.float32)
+    s_hist = np.zeros((T, (N + 7) // 8), dtype=np.uint8)
+    b = -math.expm1(-dt / tau_m)
+
+    _core_lib.sim_exact_batch_f32(
+        _core_ffi.from_buffer("float[]", I_t),
+        _core_ffi.from_buffer("float[]", v),
+        _core_ffi.from_buffer("float[]", v_hist),
+        _core_ffi.from_buffer("uint8_t[]", s_hist),
+        T, N, math.exp(-dt / tau_m), b * v_rest, b * R, v_th, v_reset,
+    )
+    return v_hist, s_hist
+
+
+def simulate_lif_exact_batch(I_t, dt, tau_m=20e-3, v_rest=0.0, v_reset=0.0, v_th=1.0, R=1.0):
+    """
+    Simulate N independent LIF neurons at once using exact integration.
+
+    Neurons are advanced in float32 by a compiled kernel that runs blocks of
+    neurons in parallel: the C/AVX2 extension from build_lif_core.py when it
+    is built (threads follow OMP_NUM_THREADS), otherwise a Numba kernel
+    (threads follow NUMBA_NUM_THREADS).
 
-    for n in range(T):
-        v, s = lif_step_exact(v, I_t[n], dt, tau_m, v_rest, v_reset, v_th, R)
-        v_hist[n] = v
-        s_hist[n] = s
+    Parameters
+    ----------
+    I_t : np.ndarray (T, N)
+        Input current at each time step for each neuron.
+    dt : float
+        Time step (seconds).
+
+    Returns
+    -------
+    t : np.ndarray (T,)
+        Time vector.
+    v_hist : np.ndarray (T, N)
+        Membrane potentials over time (float32).
+    s_hist : np.ndarray (T, ceil(N / 8))
+        Spike trains over time, packed 8 neurons per byte (bit j % 8 of byte
+        j // 8 is neuron j). Use `unpack_spikes` to expand to (T, N).
+    """
+    I_t = np.asarray(I_t, dtype=np.float32)
+    t = np.arange(I_t.shape[0]) * dt
+    params = (float(dt), float(tau_m), float(v_rest), float(v_reset), float(v_th), float(R))
+    if _core_lib is not None:
+        v_hist, s_hist = _sim_exact_batch_c(I_t, *params)
+    else:
+        v_hist, s_hist = _sim_exact_batch(I_t, *params)
 
     return t, v_hist, s_hist
+
+
+def unpack_spikes(s_packed, N):
+    """
+    Expand packed spike trains from `simulate_lif_exact_batch` to a (T, N)
+    boolean array.
+    """
+    return np.unpackbits(s_packed, axis=-1, count=N, bitorder="little").view(np.bool_)
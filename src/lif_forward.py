@@ -1,59 +1,81 @@
 import numpy as np
 
+from .lif_numba import _sim_forward
+
 
 def lif_step_forward(v, I_t, dt, tau_m, v_rest, v_reset, v_th, R=1.0):
     """
     Forward (explicit) Euler step for current-based LIF neuron.
+
+    Operates on a single scalar voltage; see simulate_lif_exact_batch for
+    populations.
     """
     dv = (-(v - v_rest) + R * I_t) * (dt / tau_m)
     v_next = v + dv
 
-    spike = (v_next >= v_th).astype(float)
-    v_next = np.where(spike > 0, v_reset, v_next)
+    spike = 1.0 if v_next >= v_th else 0.0
+    if spike:
+        v_next = v_reset
     return v_next, spike
 
 
-def simulate_lif_forward(I_t, dt, tau_m=20e-3, v_rest=0.0, v_reset=0.0, v_th=1.0, R=1.0, v_min=-1e3, v_max=1e3):
+def _raise_bad_voltage(n_fail, v):
+    """Raise FloatingPointError for a voltage a simulation kernel flagged at step n_fail."""
+    if not np.isfinite(v):
+        raise FloatingPointError(f"Non-finite voltage at step {n_fail}: v={v}")
+
+    raise FloatingPointError(
+        f"Voltage out of bounds at step {n_fail}: v={v}, "
+        f"consider reducing dt or input strength."
+    )
+
+
+def _check_voltages(v_hist, v_min, v_max):
+    """Raise FloatingPointError at the first voltage that is non-finite or outside [v_min, v_max]."""
+    bad = np.flatnonzero(~(np.isfinite(v_hist) & (v_hist >= v_min) & (v_hist <= v_max)))
+    if bad.size:
+        _raise_bad_voltage(bad[0], v_hist[bad[0]])
+
+
+def simulate_lif_forward(I_t, dt, tau_m=20e-3, v_rest=0.0, v_reset=0.0, v_th=1.0, R=1.0, v_min=-1e3, v_max=1e3,
+                         return_spike_times=False):
     """
     Simulate a single LIF neuron using forward Euler integration.
 
     Parameters
     ----------
     I_t : np.ndarray (T,)
-        Input current at each time step.
+        Input current at each time step (converted to contiguous float32).
     dt : float
         Time step (seconds).
+    return_spike_times : bool
+        If True, return (spike_times, v_hist) instead, skipping the time
+        vector and the dense spike train.
 
     Returns
     -------
     t : np.ndarray (T,)
         Time vector.
     v_hist : np.ndarray (T,)
-        Membrane potential over time.
+        Membrane potential over time (float32).
     s_hist : np.ndarray (T,)
-        Spike train (0 or 1) over time.
+        Spike train (0 or 1) over time (uint8).
     """
+    # Contiguous, so broadcast views (e.g. constant_current) reuse the same
+    # compiled kernel instead of triggering a second, strided specialisation
+    I_t = np.ascontiguousarray(I_t, dtype=np.float32)
     T = len(I_t)
-    t = np.arange(T) * dt
-    v_hist = np.zeros(T)
-    s_hist = np.zeros(T)
-    v = v_rest
-
-    for n in range(T):
-        v, s = lif_step_forward(v, I_t[n], dt, tau_m, v_rest, v_reset, v_th, R)
+    v_hist, spike_idx = _sim_forward(
+        I_t, float(dt), float(tau_m), float(v_rest), float(v_reset), float(v_th), float(R),
+    )
 
-        # Safety check
-        if not np.isfinite(v):
-            raise FloatingPointError(f"Non-finite voltage at step {n}: v={v}")
-
-        if v < v_min or v > v_max:
-            raise FloatingPointError(
-                f"Voltage out of bounds at step {n}: v={v}, "
-                f"consider reducing dt or input strength."
-            )
-
-        v_hist[n] = v
-        s_hist[n] = s
+    # Safety check
+    _check_voltages(v_hist, v_min, v_max)
 
+    if return_spike_times:
+        return spike_idx * dt, v_hist
 
+    t = np.arange(T) * dt
+    s_hist = np.zeros(T, dtype=np.uint8)
+    s_hist[spike_idx] = 1
     return t, v_hist, s_hist
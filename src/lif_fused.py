@@ -0,0 +1,112 @@
+import numpy as np
+
+from .lif_forward import _check_voltages, _raise_bad_voltage
+from .lif_numba import _sim_all_three, _sweep_all_three
+
+try:
+    # Ahead-of-time builds (see build_lif_ext.py). sim_all_three takes the
+    # same arguments as the JIT kernel, so it simply replaces it.
+    from .lif_ext import (
+        count_all_three as _count_all_three_aot,
+        first_forward_failure as _first_forward_failure_aot,
+        sim_all_three as _sim_all_three,
+    )
+except ImportError:
+    _count_all_three_aot = None
+
+
+INTEGRATORS = ("forward", "backward", "exact")
+
+
+def _sweep_all_three_aot(steps, dts, I_value, *params):
+    """
+    _sweep_all_three on the ahead-of-time kernels. pycc cannot build the
+    parallel loop, so the dt values run one after another, but nothing is
+    JIT-compiled.
+    """
+    D = len(dts)
+    n_spikes = np.empty((D, 3), dtype=np.int64)
+    first_idx = np.empty((D, 3), dtype=np.int64)
+    n_fail = np.full(D, -1, dtype=np.int64)
+    v_fail = np.zeros(D)
+
+    for i in range(D):
+        n_spikes[i], first_idx[i], ok = _count_all_three_aot(I_value, steps[i], dts[i], *params)
+        if not ok:
+            n_fail[i], v_fail[i] = _first_forward_failure_aot(I_value, steps[i], dts[i], *params)
+
+    return n_spikes, first_idx, n_fail, v_fail
+
+
+def simulate_lif_all(I_t, dt, tau_m=20e-3, v_rest=0.0, v_reset=0.0, v_th=1.0, R=1.0, v_min=-1e3, v_max=1e3):
+    """
+    Simulate the same LIF neuron with all three integrators in a single pass
+    over the input.
+
+    Equivalent to calling simulate_lif_forward, simulate_lif_backward and
+    simulate_lif_exact with return_spike_times=True, but the input is read
+    once and the three updates share one compiled loop. The forward Euler
+    bounds check (v_min, v_max) applies as in simulate_lif_forward.
+
+    Returns
+    -------
+    results : dict
+        Maps "forward", "backward" and "exact" to (spike_times, v_hist).
+    """
+    I_t = np.ascontiguousarray(I_t, dtype=np.float32)
+    v_hist, spike_idx, n_spikes = _sim_all_three(
+        I_t, float(dt), float(tau_m), float(v_rest), float(v_reset), float(v_th), float(R),
+    )
+    _check_voltages(v_hist[0], v_min, v_max)
+
+    return {
+        name: (spike_idx[i, :n_spikes[i]] * dt, v_hist[i])
+        for i, name in enumerate(INTEGRATORS)
+    }
+
+
+def sweep_lif_all(dt_values, T, I_value, tau_m=20e-3, v_rest=0.0, v_reset=0.0, v_th=1.0, R=1.0,
+                  v_min=-1e3, v_max=1e3):
+    """
+    Spike statistics of all three integrators under a constant current for
+    several time steps.
+
+    The dt values are independent, so they are simulated in parallel
+    (thread count follows NUMBA_NUM_THREADS), or serially with the
+    ahead-of-time kernels when build_lif_ext.py has been run. Only spike
+    statistics are kept, so memory use does not grow with the number of
+    steps. Each run tracks only the range of its forward Euler voltage; if
+    that leaves [v_min, v_max] (or is non-finite) the run is repeated to
+    find the failing step, and FloatingPointError is raised as in
+    simulate_lif_forward.
+
+    Parameters
+    ----------
+    dt_values : sequence of float
+        Time steps (seconds); each run has int(T / dt) steps.
+    T : float
+        Simulation duration (seconds).
+    I_value : float
+        Constant input current.
+
+    Returns
+    -------
+    n_spikes : np.ndarray (D, 3)
+        Spike count per dt and integrator (columns ordered as INTEGRATORS).
+    first_spike : np.ndarray (D, 3)
+        Time of the first spike, or NaN if there was none.
+    """
+    dts = np.asarray(dt_values, dtype=float)
+    steps = np.array([int(T / dt) for dt in dt_values], dtype=np.int64)
+    sweep = _sweep_all_three if _count_all_three_aot is None else _sweep_all_three_aot
+    n_spikes, first_idx, n_fail, v_fail = sweep(
+        steps, dts, float(np.float32(I_value)), float(tau_m), float(v_rest), float(v_reset),
+        float(v_th), float(R), float(v_min), float(v_max),
+    )
+    failed = np.flatnonzero(n_fail >= 0)
+    if failed.size:
+        i = failed[0]
+        _raise_bad_voltage(n_fail[i], v_fail[i])
+
+    first_spike = np.where(first_idx >= 0, first_idx * dts[:, None], np.nan)
+    return n_spikes, first_spike
@@ -0,0 +1,368 @@
+import math
+
+import numpy as np
+from numba import njit, prange
+
+
+# Compiled per-step loops behind the simulate_lif_* functions. Each kernel
+# takes only a 1-D input array and scalar parameters so that the whole time
+# loop runs as scalar machine code instead of one Python call per step.
+#
+# Voltages are stored as float32 (the running voltage itself stays a float64
+# scalar, which costs nothing in registers). Spikes are recorded as the step
+# indices at which they occur rather than as a dense T-length train.
+
+
+# Neurons per parallel work item in the batched kernel. A multiple of 8 so that
+# each item owns whole bytes of the packed spike array.
+_BLOCK = 64
+
+
+@njit(fastmath=True, cache=True)
+def _sim_forward(I_t, dt, tau_m, v_rest, v_reset, v_th, R):
+    """
+    Forward Euler loop. Returns (v_hist, spike_idx).
+
+    There is no stability check in the loop: an unstable run simply goes on
+    to inf/NaN, and the caller scans v_hist afterwards.
+    """
+    T = I_t.shape[0]
+    v_hist = np.zeros(T, dtype=np.float32)
+    spike_idx = np.empty(T, dtype=np.int64)
+    k = 0
+    # v_{n+1} = v_n + alpha*(-(v_n - v_rest) + R*I_n), regrouped so that
+    # only one multiply-add on the input is left inside the loop.
+    alpha = dt / tau_m
+    decay = 1.0 - alpha
+    bias = alpha * v_rest
+    gain = alpha * R
+    v = v_rest
+
+    for n in range(T):
+        v = decay * v + bias + gain * I_t[n]
+        if v >= v_th:
+            v = v_reset
+            spike_idx[k] = n
+            k += 1
+        v_hist[n] = v
+
+    return v_hist, spike_idx[:k].copy()
+
+
+@njit(fastmath=True, cache=True)
+def _sim_backward(I_t, dt, tau_m, v_rest, v_reset, v_th, R):
+    """
+    Backward Euler loop. Returns (v_hist, spike_idx).
+    """
+    T = I_t.shape[0]
+    v_hist = np.zeros(T, dtype=np.float32)
+    spike_idx = np.empty(T, dtype=np.int64)
+    k = 0
+    # v_{n+1} = (v_n + alpha*(v_rest + R*I_n)) / (1 + alpha), with the
+    # division folded into loop-invariant coefficients.
+    alpha = dt / tau_m
+    inv = 1.0 / (1.0 + alpha)
+    bias = alpha * v_rest * inv
+    gain = alpha * R * inv
+    v = v_rest
+
+    for n in range(T):
+        v = inv * v + bias + gain * I_t[n]
+        if v >= v_th:
+            v = v_reset
+            spike_idx[k] = n
+            k += 1
+        v_hist[n] = v
+
+    return v_hist, spike_idx[:k].copy()
+
+
+@njit(fastmath=True, cache=True)
+def _sim_exact_into(I_t, dt, tau_m, v_rest, v_reset, v_th, R, v_hist, spike_idx):
+    """
+    Exact (exponential) integration loop writing into caller-provided
+    v_hist and spike_idx (both of length T). Returns the number of spikes.
+
+    Allocation-free so that build_lif_ext.py can compile it ahead of time.
+    """
+    T = I_t.shape[0]
+    k = 0
+    # v_{n+1} = v_inf + (v_n - v_inf)*a with v_inf = v_rest + R*I_n, i.e.
+    # a*v_n + (1 - a)*v_inf; expm1 keeps (1 - a) accurate for small dt.
+    a = math.exp(-dt / tau_m)
+    b = -math.expm1(-dt / tau_m)
+    bias = b * v_rest
+    gain = b * R
+    v = v_rest
+
+    for n in range(T):
+        v = a * v + bias + gain * I_t[n]
+        if v >= v_th:
+            v = v_reset
+            spike_idx[k] = n
+            k += 1
+        v_hist[n] = v
+
+    return k
+
+
+@njit(fastmath=True, cache=True)
+def _sim_exact(I_t, dt, tau_m, v_rest, v_reset, v_th, R):
+    """
+    Exact (exponential) integration loop. Returns (v_hist, spike_idx).
+    """
+    T = I_t.shape[0]
+    v_hist = np.zeros(T, dtype=np.float32)
+    spike_idx = np.empty(T, dtype=np.int64)
+    k = _sim_exact_into(I_t, dt, tau_m, v_rest, v_reset, v_th, R, v_hist, spike_idx)
+    return v_hist, spike_idx[:k].copy()
+
+
+@njit(fastmath=True, cache=True)
+def _sim_exact_const(I_value, T, dt, tau_m, v_rest, v_reset, v_th, R):
+    """
+    Exact integration loop for a constant input current I_value over T steps.
+    Returns (v_hist, spike_idx).
+
+    With the input fixed, the update is v <- a*v + c with both coefficients
+    loop-invariant, so the loop reads no input memory at all.
+    """
+    v_hist = np.zeros(T, dtype=np.float32)
+    spike_idx = np.empty(T, dtype=np.int64)
+    k = 0
+    a = math.exp(-dt / tau_m)
+    c = -math.expm1(-dt / tau_m) * (v_rest + R * I_value)
+    v = v_rest
+
+    for n in range(T):
+        v = a * v + c
+        if v >= v_th:
+            v = v_reset
+            spike_idx[k] = n
+            k += 1
+        v_hist[n] = v
+
+    return v_hist, spike_idx[:k].copy()
+
+
+@njit(fastmath=True, cache=True)
+def _sim_all_three(I_t, dt, tau_m, v_rest, v_reset, v_th, R):
+    """
+    Forward, backward and exact integration of the same input in one pass.
+
+    Returns (v_hist, spike_idx, n_spikes). Row i of the (3, T) arrays
+    belongs to forward, backward and exact respectively, and only the first
+    n_spikes[i] entries of spike_idx[i] are valid. As in _sim_forward, the
+    forward voltages are left for the caller to check.
+    """
+    T = I_t.shape[0]
+    v_hist = np.zeros((3, T), dtype=np.float32)
+    spike_idx = np.empty((3, T), dtype=np.int64)
+    n_spikes = np.zeros(3, dtype=np.int64)
+
+    alpha = dt / tau_m
+    f_decay = 1.0 - alpha
+    f_bias = alpha * v_rest
+    f_gain = alpha * R
+    inv = 1.0 / (1.0 + alpha)
+    b_bias = alpha * v_rest * inv
+    b_gain = alpha * R * inv
+    a = math.exp(-dt / tau_m)
+    b = -math.expm1(-dt / tau_m)
+    e_bias = b * v_rest
+    e_gain = b * R
+    v_f = v_rest
+    v_b = v_rest
+    v_e = v_rest
+
+    for n in range(T):
+        I_n = I_t[n]
+        v_f = f_decay * v_f + f_bias + f_gain * I_n
+        v_b = inv * v_b + b_bias + b_gain * I_n
+        v_e = a * v_e + e_bias + e_gain * I_n
+
+        if v_f >= v_th:
+            v_f = v_reset
+            spike_idx[0, n_spikes[0]] = n
+            n_spikes[0] += 1
+        if v_b >= v_th:
+            v_b = v_reset
+            spike_idx[1, n_spikes[1]] = n
+            n_spikes[1] += 1
+        if v_e >= v_th:
+            v_e = v_reset
+            spike_idx[2, n_spikes[2]] = n
+            n_spikes[2] += 1
+
+        v_hist[0, n] = v_f
+        v_hist[1, n] = v_b
+        v_hist[2, n] = v_e
+
+    return v_hist, spike_idx, n_spikes
+
+
+# Fast-math without the no-NaN/no-inf assumptions, for kernels that have to
+# detect a diverging forward Euler run themselves.
+_FASTMATH_FINITE = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
+
+@njit(fastmath=_FASTMATH_FINITE, cache=True)
+def _voltage_ok(v, v_min, v_max):
+    """Whether v, rounded to float32 as in v_hist, is finite and in [v_min, v_max]."""
+    v = np.float32(v)
+    return math.isfinite(v) and v >= v_min and v <= v_max
+
+
+@njit(fastmath=_FASTMATH_FINITE, cache=True)
+def _count_all_three(I_value, T, dt, tau_m, v_rest, v_reset, v_th, R, v_min, v_max):
+    """
+    Same updates as _sim_all_three under a constant input I_value, keeping
+    only spike statistics instead of (3, T) histories.
+
+    Returns (n_spikes, first_idx, ok). n_spikes and first_idx have one entry
+    per integrator, with first_idx = -1 where there was no spike. ok is False
+    if any forward voltage would fail the check in simulate_lif_forward; the
+    loop only tracks the range of v_f, so _first_forward_failure has to be
+    run to find the step.
+    """
+    n_spikes = np.zeros(3, dtype=np.int64)
+    first_idx = np.full(3, -1, dtype=np.int64)
+
+    # Each update is v <- decay*v + drive with both terms loop-invariant
+    alpha = dt / tau_m
+    f_decay = 1.0 - alpha
+    f_drive = alpha * v_rest + alpha * R * I_value
+    inv = 1.0 / (1.0 + alpha)
+    b_drive = alpha * v_rest * inv + alpha * R * inv * I_value
+    a = math.exp(-dt / tau_m)
+    b = -math.expm1(-dt / tau_m)
+    e_drive = b * v_rest + b * R * I_value
+    v_f = v_rest
+    v_b = v_rest
+    v_e = v_rest
+    v_lo = np.inf
+    v_hi = -np.inf
+
+    for n in range(T):
+        v_f = f_decay * v_f + f_drive
+        v_b = inv * v_b + b_drive
+        v_e = a * v_e + e_drive
+
+        if v_f >= v_th:
+            v_f = v_reset
+            if n_spikes[0] == 0:
+                first_idx[0] = n
+            n_spikes[0] += 1
+        if v_b >= v_th:
+            v_b = v_reset
+            if n_spikes[1] == 0:
+                first_idx[1] = n
+            n_spikes[1] += 1
+        if v_e >= v_th:
+            v_e = v_reset
+            if n_spikes[2] == 0:
+                first_idx[2] = n
+            n_spikes[2] += 1
+
+        v_lo = min(v_lo, v_f)
+        v_hi = max(v_hi, v_f)
+
+    # A NaN can slip past min/max, but it never resets, so it is still in v_f
+    ok = T == 0 or (
+        _voltage_ok(v_lo, v_min, v_max) and _voltage_ok(v_hi, v_min, v_max)
+        and _voltage_ok(v_f, v_min, v_max)
+    )
+    return n_spikes, first_idx, ok
+
+
+@njit(fastmath=_FASTMATH_FINITE, cache=True)
+def _first_forward_failure(I_value, T, dt, tau_m, v_rest, v_reset, v_th, R, v_min, v_max):
+    """
+    Forward Euler loop of _count_all_three with a per-step check. Returns
+    the first failing step and its voltage (as stored in float32), or (-1, 0.0).
+    """
+    alpha = dt / tau_m
+    f_decay = 1.0 - alpha
+    f_drive = alpha * v_rest + alpha * R * I_value
+    v_f = v_rest
+
+    for n in range(T):
+        v_f = f_decay * v_f + f_drive
+        if v_f >= v_th:
+            v_f = v_reset
+        if not _voltage_ok(v_f, v_min, v_max):
+            return n, float(np.float32(v_f))
+
+    return -1, 0.0
+
+
+@njit(fastmath=True, cache=True, parallel=True)
+def _sweep_all_three(steps, dts, I_value, tau_m, v_rest, v_reset, v_th, R, v_min, v_max):
+    """
+    Run _count_all_three under constant input I_value for each dts[i] over
+    steps[i] steps, with the dt values run in parallel.
+
+    Returns (n_spikes, first_idx, n_fail, v_fail), indexed by sweep position.
+    n_spikes and first_idx are (D, 3) with first_idx = -1 where an integrator
+    did not spike; n_fail and v_fail describe any forward Euler failure.
+    """
+    D = dts.shape[0]
+    n_spikes = np.zeros((D, 3), dtype=np.int64)
+    first_idx = np.full((D, 3), -1, dtype=np.int64)
+    n_fail = np.full(D, -1, dtype=np.int64)
+    v_fail = np.zeros(D)
+
+    for i in prange(D):
+        counts, first, ok = _count_all_three(
+            I_value, steps[i], dts[i], tau_m, v_rest, v_reset, v_th, R, v_min, v_max
+        )
+        for j in range(3):
+            n_spikes[i, j] = counts[j]
+            first_idx[i, j] = first[j]
+        if not ok:
+            n_fail[i], v_fail[i] = _first_forward_failure(
+                I_value, steps[i], dts[i], tau_m, v_rest, v_reset, v_th, R, v_min, v_max
+            )
+
+    return n_spikes, first_idx, n_fail, v_fail
+
+
+@njit(fastmath=True, cache=True, parallel=True)
+def _sim_exact_batch(I_t, dt, tau_m, v_rest, v_reset, v_th, R):
+    """
+    Exact integration of N independent neurons, input shape (T, N).
+
+    Neurons are split into blocks of _BLOCK run in parallel; each block keeps
+    its own float32 state and assembles each spike byte in a register.
+    Returns (v_hist, s_hist) with s_hist packed as in simulate_lif_exact_batch.
+    """
+    T, N = I_t.shape
+    v_hist = np.empty((T, N), dtype=np.float32)
+    s_hist = np.empty((T, (N + 7) // 8), dtype=np.uint8)  # every byte is written
+    a = np.float32(math.exp(-dt / tau_m))
+    b = -math.expm1(-dt / tau_m)
+    bias = np.float32(b * v_rest)
+    gain = np.float32(b * R)
+    th = np.float32(v_th)
+    reset = np.float32(v_reset)
+
+    for blk in prange((N + _BLOCK - 1) // _BLOCK):
+        j0 = blk * _BLOCK
+        j1 = min(j0 + _BLOCK, N)
+        v = np.full(j1 - j0, np.float32(v_rest), dtype=np.float32)
+        for n in range(T):
+            for g in range(j0, j1, 8):
+                bits = np.uint8(0)
+                for j in range(g, min(g + 8, j1)):
+                    x = a * v[j - j0] + (bias + gain * I_t[n, j])
+                    # Compare and select rather than branch, so the loop body
+                    # stays straight-line; unlike an arithmetic blend, a select
+                    # also resets an inf voltage instead of turning it into NaN
+                    spike = x >= th
+                    x = reset if spike else x
+                    bits |= np.uint8(spike) << np.uint8(j - g)
+                    v[j - j0] = x
+                    v_hist[n, j] = x
+                s_hist[n, g >> 3] = bits
+
+    return v_hist, s_hist
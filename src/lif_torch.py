@@ -0,0 +1,68 @@
+import math
+
+import torch
+
+
+def _exact_step(v, I_n, a, bias, gain, v_th, v_reset):
+    """
+    One exact-integration step for a population: v <- a*v + (1 - a)*v_inf,
+    then threshold and reset. Returns (v_next, spike).
+    """
+    v_next = a * v + (bias + gain * I_n)
+    spike = v_next >= v_th
+    return v_next.masked_fill(spike, v_reset), spike
+
+
+def simulate_lif_exact_torch(I_t, dt, tau_m=20e-3, v_rest=0.0, v_reset=0.0, v_th=1.0, R=1.0,
+                             compile_step=False):
+    """
+    Simulate N independent LIF neurons with exact integration in PyTorch.
+
+    Same dynamics as simulate_lif_exact_batch, but the simulation runs on
+    whatever device I_t lives on, so large populations can be simulated on
+    a GPU. Each time step is a few elementwise kernels over all neurons.
+
+    Parameters
+    ----------
+    I_t : torch.Tensor (T, N)
+        Input current at each time step for each neuron. The simulation
+        uses its device and floating-point dtype; integer inputs are
+        converted to float32.
+    dt : float
+        Time step (seconds).
+    compile_step : bool
+        If True, fuse the per-step update into a single kernel with
+        torch.compile. Worth it for long simulations; the first call pays
+        the compilation cost.
+
+    Returns
+    -------
+    t : torch.Tensor (T,)
+        Time vector.
+    v_hist : torch.Tensor (T, N)
+        Membrane potentials over time.
+    s_hist : torch.Tensor (T, N)
+        Spike trains over time (bool).
+    """
+    if not I_t.is_floating_point():
+        I_t = I_t.float()
+    T, N = I_t.shape
+    device = I_t.device
+    t = torch.arange(T, device=device, dtype=torch.float64) * dt
+    v_hist = torch.empty((T, N), dtype=I_t.dtype, device=device)
+    s_hist = torch.empty((T, N), dtype=torch.bool, device=device)
+    v = torch.full((N,), v_rest, dtype=I_t.dtype, device=device)
+
+    # Plain Python floats, so no host/device transfers inside the loop
+    a = math.exp(-dt / tau_m)
+    b = -math.expm1(-dt / tau_m)
+    bias = b * v_rest
+    gain = b * R
+    step = torch.compile(_exact_step) if compile_step else _exact_step
+
+    for n in range(T):
+        v, spike = step(v, I_t[n], a, bias, gain, v_th, v_reset)
+        v_hist[n] = v
+        s_hist[n] = spike
+
+    return t, v_hist, s_hist
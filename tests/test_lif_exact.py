@@ -0,0 +1,85 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+
+# Allow importing from src/ when running the tests from the repo root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from src.lif_exact import (
+    _simulate_exact_segments, simulate_lif_exact, simulate_lif_exact_batch, simulate_lif_exact_const,
+    unpack_spikes,
+)
+from src.lif_numba import _sim_exact
+
+
+# tau_m, v_rest, v_reset, v_th, R
+PARAMS = (20e-3, 0.0, 0.0, 1.0, 1.0)
+
+
+def _reference(I_t, dt):
+    """Spike times and voltages from the plain compiled step loop."""
+    v_hist, spike_idx = _sim_exact(np.asarray(I_t, dtype=np.float32), dt, *PARAMS)
+    return spike_idx * dt, v_hist
+
+
+@pytest.mark.parametrize("dt", [1e-4, 1e-3, 1e-2])
+@pytest.mark.parametrize("I_value", [0.5, 1.0, 1.5, 3.0])
+def test_constant_input_matches_step_loop(I_value, dt):
+    steps = 200000
+    spike_times_ref, v_ref = _reference(np.full(steps, I_value), dt)
+
+    for spike_times, v_hist in [
+        simulate_lif_exact(np.full(steps, I_value), dt, return_spike_times=True),
+        simulate_lif_exact_const(I_value, steps, dt, return_spike_times=True),
+    ]:
+        np.testing.assert_array_equal(spike_times, spike_times_ref)
+        np.testing.assert_allclose(v_hist, v_ref, atol=1e-5)
+
+
+def _segments(I_t, dt):
+    """Spike times and voltages from the closed-form segment solver."""
+    I_t = np.asarray(I_t, dtype=np.float32)
+    starts = np.concatenate(([0], np.flatnonzero(I_t[1:] != I_t[:-1]) + 1))
+    v_hist, spike_idx = _simulate_exact_segments(I_t, starts, dt, *PARAMS)
+    return spike_idx * dt, v_hist
+
+
+def test_segments_never_spike_at_rheobase():
+    # v_inf == v_th: the voltage only approaches threshold asymptotically
+    for dt in [1e-4, 1e-2]:
+        spike_times, _ = _segments(np.full(200000, 1.0), dt)
+        assert len(spike_times) == 0
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_segments_match_step_loop(seed):
+    rng = np.random.default_rng(seed)
+    n_runs = rng.integers(1, 8)
+    I_t = np.repeat(rng.uniform(-2.0, 4.0, n_runs), rng.integers(1, 2000, n_runs))
+    dt = rng.choice([1e-4, 1e-3, 5e-3])
+
+    spike_times_ref, v_ref = _reference(I_t, dt)
+    spike_times, v_hist = _segments(I_t, dt)
+
+    np.testing.assert_array_equal(spike_times, spike_times_ref)
+    np.testing.assert_allclose(v_hist, v_ref, atol=1e-5)
+
+
+def test_batch_matches_single_neuron_runs():
+    # 19 neurons: a full vector of 8, plus a partial byte of spikes
+    rng = np.random.default_rng(0)
+    I_t = rng.uniform(0.0, 3.0, (500, 19)).astype(np.float32)
+    I_t[0, :] = np.inf  # an inf input still just resets the neuron
+
+    _, v_hist, s_packed = simulate_lif_exact_batch(I_t, 1e-3)
+    s_hist = unpack_spikes(s_packed, I_t.shape[1])
+
+    for j in range(I_t.shape[1]):
+        _, v_ref, s_ref = simulate_lif_exact(I_t[:, j], 1e-3)
+        np.testing.assert_allclose(v_hist[:, j], v_ref, atol=1e-5)
+        np.testing.assert_array_equal(s_hist[:, j], s_ref)
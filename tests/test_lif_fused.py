@@ -0,0 +1,46 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+
+# Allow importing from src/ when running the tests from the repo root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from src.lif_forward import simulate_lif_forward
+from src.lif_fused import INTEGRATORS, simulate_lif_all, sweep_lif_all
+
+
+@pytest.mark.parametrize("I_value", [0.5, 1.5, 3.0])
+def test_sweep_matches_single_runs(I_value):
+    dt_values = [1e-4, 5e-4, 1e-3, 2e-3, 5e-3]
+    n_spikes, first_spike = sweep_lif_all(dt_values, 1.0, I_value)
+
+    for i, dt in enumerate(dt_values):
+        results = simulate_lif_all(np.full(int(1.0 / dt), I_value), dt)
+        for j, name in enumerate(INTEGRATORS):
+            spike_times = results[name][0]
+            assert n_spikes[i, j] == len(spike_times)
+            if len(spike_times):
+                assert first_spike[i, j] == pytest.approx(spike_times[0])
+            else:
+                assert np.isnan(first_spike[i, j])
+
+
+@pytest.mark.parametrize("run", [
+    lambda kw: simulate_lif_forward(np.full(1000, 1.0), 0.1, **kw),
+    lambda kw: simulate_lif_all(np.full(1000, 1.0), 0.1, **kw),
+    lambda kw: sweep_lif_all([1e-3, 0.1], 100.0, 1.0, **kw),
+])
+@pytest.mark.parametrize("bounds, message", [
+    ({}, "out of bounds"),
+    # Infinite bounds: only the finiteness test can catch the divergence
+    ({"v_min": -np.inf, "v_max": np.inf}, "Non-finite"),
+])
+def test_unstable_forward_euler_raises(run, bounds, message):
+    # dt = 5*tau_m with no threshold: forward Euler oscillates and diverges
+    with pytest.raises(FloatingPointError, match=message):
+        run(dict(v_th=np.inf, **bounds))
@@ -0,0 +1,34 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+
+# Allow importing from src/ when running the tests from the repo root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from src.lif_exact import simulate_lif_exact_batch, unpack_spikes
+from src.lif_torch import simulate_lif_exact_torch
+
+
+@pytest.mark.parametrize("dtype", [torch.float32, torch.int64])
+def test_matches_batch_simulator(dtype):
+    # Integer currents must be simulated as floats, not truncate the voltages
+    rng = np.random.default_rng(0)
+    if dtype.is_floating_point:
+        I_np = rng.uniform(0.0, 3.0, (500, 19)).astype(np.float32)
+    else:
+        I_np = rng.integers(0, 4, (500, 19)).astype(np.float32)
+
+    t, v_hist, s_hist = simulate_lif_exact_torch(torch.from_numpy(I_np).to(dtype), 1e-3)
+    t_ref, v_ref, s_packed = simulate_lif_exact_batch(I_np, 1e-3)
+
+    assert v_hist.dtype == torch.float32
+    np.testing.assert_allclose(t.numpy(), t_ref)
+    np.testing.assert_allclose(v_hist.numpy(), v_ref, atol=1e-5)
+    np.testing.assert_array_equal(s_hist.numpy(), unpack_spikes(s_packed, I_np.shape[1]))